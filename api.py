@@ -1,35 +1,63 @@
-import base64
+import functools
+import mmap
+import os
 import pathlib
-from typing import Literal
-from fastapi import FastAPI, Path, Query
-from pydantic import BaseModel, Field
+import threading
+from enum import Enum
+import orjson
+import pybase64
+from fastapi import FastAPI, Path, Query, Request, Response
+from fastapi.middleware.gzip import GZipMiddleware
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from datetime import date
 
 from fastapi.openapi.utils import get_openapi
+from starlette.routing import Route
+
+
+class Category(str, Enum):
+    """Category of a menu item."""
+
+    MAIN = "MAIN"
+    SIDE = "SIDE"
+    BOTTLE = "BOTTLE"
+    DESSERT = "DESSERT"
+    DRINK = "DRINK"
+    SALAD = "SALAD"
+    SOUP = "SOUP"
+    OTHER = "OTHER"
 
 
 class Item(BaseModel):
-    id: str | None = Field(description="")
-    name: str = Field(
-        description='Optional unique identifier for the article, such as a GUID. Must not contain any "." or "/" characters. Different articles with the same price on different days should still have different IDs. If not set, a unique ID will be generated internally.'
+    id: str = Field(
+        default="",
+        description='Optional unique identifier for the article, such as a GUID. Must not contain any "." or "/" characters. Different articles with the same price on different days should still have different IDs. If not set, a unique ID will be generated internally.',
     )
+    name: str = Field(description="Name of the article.")
     price: float = Field(
         description="The default price for the articles. Default prices are shown to guests before authentication. Yet, the final price is based on priceLookup if present."
     )
     priceLookup: str = Field(
         description="The price lookup code for the article. Whatever identifier is used in the cash register to identify the price group of articles, such as an article ID."
     )
-    category: Literal[
-        "MAIN", "SIDE", "BOTTLE", "DESSERT", "DRINK", "SALAD", "SOUP", "OTHER"
-    ] = Field(description="Category of the item.")
+    category: Category = Field(description="Category of the item.")
+
+    model_config = ConfigDict(frozen=True)
+
+    @field_validator("id", mode="before")
+    @classmethod
+    def none_as_empty_id(cls, value):
+        """Accept an explicit null id as "not set"."""
+        return "" if value is None else value
 
 
 class Menu(BaseModel):
     date: str = Field(description="ISO date for which the menu is valid.")
     items: list[Item] = Field(description="List of items on the menu.")
 
-    class Config:
-        schema_extra = {
+    model_config = ConfigDict(
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "date": "2022-10-07",
                 "items": [
@@ -49,14 +77,16 @@ class Menu(BaseModel):
                     },
                 ],
             }
-        }
+        },
+    )
 
 
 class Menus(BaseModel):
     menus: list[Menu] = Field(description="List of menus on separate dates.")
 
-    class Config:
-        schema_extra = {
+    model_config = ConfigDict(
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "menus": [
                     {
@@ -95,7 +125,8 @@ class Menus(BaseModel):
                     },
                 ]
             }
-        }
+        },
+    )
 
 
 class Message(BaseModel):
@@ -104,82 +135,71 @@ class Message(BaseModel):
     message: str
 
 
+_ITEM_BURGER = Item(name="Burger", price=3.0, priceLookup="123", category=Category.MAIN)
+_ITEM_PASTA = Item(name="Pasta", price=3.0, priceLookup="123", category=Category.MAIN)
+_ITEM_SALAD = Item(name="Salad", price=1.5, priceLookup="456", category=Category.SALAD)
+_ITEM_SALAD_546 = Item(
+    name="Salad", price=1.5, priceLookup="546", category=Category.SALAD
+)
+
+_STATIC_MENU_2023_01_01 = Menu(date="2023-01-01", items=[_ITEM_BURGER, _ITEM_SALAD])
+_STATIC_MENU_2023_01_02 = Menu(date="2023-01-02", items=[_ITEM_PASTA, _ITEM_SALAD_546])
+_STATIC_MENUS = Menus(menus=[_STATIC_MENU_2023_01_01, _STATIC_MENU_2023_01_02])
+
+_STATIC_MENU_BYTES = orjson.dumps(
+    _STATIC_MENU_2023_01_01.model_dump(exclude_unset=True)
+)
+_STATIC_MENUS_BYTES = orjson.dumps(_STATIC_MENUS.model_dump(exclude_unset=True))
+
+
 app = FastAPI(
     title="VisioLab Menu Import API",
     description="API for importing menus into the VisioLab backend.",
 )
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 
 @app.get(
-    "/menus/{date}",
-    summary="Get menu for date",
+    "/menus/today",
+    summary="Get menu for today",
+    response_model=None,
     responses={
         200: {"model": Menu, "description": "The menu."},
         404: {
             "model": Message,
-            "description": "No menu available for the requested date.",
+            "description": "No menu available for today.",
         },
     },
 )
-async def get_menu(
-    date: str = Path(
-        description="Date for which the menu is requested.",
-        example="2023-01-01",
-    )
-):
-    return {
-        "date": "2023-01-01",
-        "items": [
-            {
-                "name": "Burger",
-                "price": 3.0,
-                "priceLookup": "123",
-                "category": "MAIN",
-            },
-            {
-                "name": "Salad",
-                "price": 1.5,
-                "priceLookup": "456",
-                "category": "SALAD",
-            },
-        ],
-    }
+async def get_todays_menu(request: Request) -> Response:
+    return Response(_STATIC_MENU_BYTES, media_type="application/json")
 
 
 @app.get(
-    "/menus/today",
-    summary="Get menu for today",
+    "/menus/{date}",
+    summary="Get menu for date",
+    response_model=None,
     responses={
         200: {"model": Menu, "description": "The menu."},
         404: {
             "model": Message,
-            "description": "No menu available for today.",
+            "description": "No menu available for the requested date.",
         },
     },
 )
-async def get_todays_menu():
-    return {
-        "date": "2023-01-01",
-        "items": [
-            {
-                "name": "Burger",
-                "price": 3.0,
-                "priceLookup": "123",
-                "category": "MAIN",
-            },
-            {
-                "name": "Salad",
-                "price": 1.5,
-                "priceLookup": "456",
-                "category": "SALAD",
-            },
-        ],
-    }
+async def get_menu(
+    date: date = Path(
+        description="Date for which the menu is requested.",
+        example="2023-01-01",
+    )
+):
+    return Response(_STATIC_MENU_BYTES, media_type="application/json")
 
 
 @app.get(
     "/menus/",
     summary="Get menus for date range",
+    response_model=None,
     responses={
         200: {"model": Menus, "description": "The menus."},
         404: {
@@ -189,74 +209,140 @@ async def get_todays_menu():
     },
 )
 async def get_menus(
-    start: str = Query(
+    start: date = Query(
         description="Start date for which the menus are requested.",
         example="2023-01-01",
     ),
-    end: str = Query(
+    end: date = Query(
         description="End date for which the menus are requested (inclusive).",
         example="2023-01-02",
     ),
 ):
     """Get items available in cash register to synchronize prices."""
-    return {
-        "menus": [
-            {
-                "date": "2023-01-01",
-                "items": [
-                    {
-                        "name": "Burger",
-                        "price": 3.0,
-                        "priceLookup": "123",
-                        "category": "MAIN",
-                    },
-                    {
-                        "name": "Salad",
-                        "price": 1.5,
-                        "priceLookup": "456",
-                        "category": "SALAD",
-                    },
-                ],
-            },
-            {
-                "date": "2023-01-02",
-                "items": [
-                    {
-                        "name": "Pasta",
-                        "price": 3.0,
-                        "priceLookup": "123",
-                        "category": "MAIN",
-                    },
-                    {
-                        "name": "Salad",
-                        "price": 1.5,
-                        "priceLookup": "546",
-                        "category": "SALAD",
-                    },
-                ],
-            },
-        ]
-    }
+    return Response(_STATIC_MENUS_BYTES, media_type="application/json")
+
+
+# The FastAPI route for /menus/today stays registered for the OpenAPI schema;
+# requests are answered by this plain Starlette route for the same endpoint
+# first, skipping dependency resolution. /menus/{date} stays on FastAPI so its
+# date parameter is still validated.
+app.router.routes.insert(
+    0, Route("/menus/today", endpoint=get_todays_menu, methods=["GET"])
+)
 
 
-def as_base64_url(path):
-    return "data:image/png;base64, " + base64.b64encode(
-        pathlib.Path(path).read_bytes()
-    ).decode("utf-8")
+@functools.cache
+def as_base64_url(path, chunk=57 * 1024):
+    # chunk is a multiple of 3, so no padding is emitted between chunks.
+    encoded = bytearray(b"data:image/png;base64,")
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        # An empty file cannot be mapped; it encodes to the bare prefix.
+        if os.fstat(fd).st_size == 0:
+            return encoded.decode("ascii")
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as m, memoryview(m) as view:
+            for start in range(0, len(view), chunk):
+                encoded += pybase64.b64encode(view[start : start + chunk])
+    finally:
+        os.close(fd)
+    return encoded.decode("ascii")
+
+
+LOGO_PATH = pathlib.Path(__file__).with_name("logo.png")
+LOGO_DATA_URL = as_base64_url(LOGO_PATH)
+
+
+class _RoutesKey:
+    """Cache key comparing routes by identity; holding them keeps their ids unique.
+
+    Starlette routes define `__eq__` without `__hash__`, so they cannot be
+    used in a cache key directly.
+    """
+
+    def __init__(self, routes):
+        self.routes = tuple(routes)
+
+    def __hash__(self):
+        return hash(tuple(id(route) for route in self.routes))
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, _RoutesKey)
+            and len(self.routes) == len(other.routes)
+            and all(a is b for a, b in zip(self.routes, other.routes))
+        )
+
+
+@functools.lru_cache(maxsize=4)
+def _build_openapi(title, version, description, routes_key):
+    return get_openapi(
+        title=title,
+        version=version,
+        description=description,
+        routes=routes_key.routes,
+    )
+
+
+_openapi_lock = threading.Lock()
 
 
 def custom_openapi():
     if app.openapi_schema:
         return app.openapi_schema
-    openapi_schema = get_openapi(
-        title=app.title,
-        version=app.version,
-        description=app.description,
-        routes=app.routes,
-    )
-    openapi_schema["info"]["x-logo"] = {"url": as_base64_url("./logo.png")}
-    app.openapi_schema = openapi_schema
+    with _openapi_lock:
+        # Another thread may have built the schema while we waited.
+        if app.openapi_schema:
+            return app.openapi_schema
+        schema = _build_openapi(
+            app.title, app.version, app.description, _RoutesKey(app.routes)
+        )
+        # Copy the levels we touch so the cached schema stays pristine.
+        openapi_schema = {
+            **schema,
+            "info": {**schema["info"], "x-logo": {"url": LOGO_DATA_URL}},
+        }
+        openapi_bytes(openapi_schema)
+        app.openapi_schema = openapi_schema
     return app.openapi_schema
 
 
+def openapi_bytes(schema, root_path=""):
+    """Return `schema` encoded as JSON, cached together with the schema it came from.
+
+    A non-empty `root_path` is added to `servers` like FastAPI's own handler
+    does, with one encoded copy kept per root path.
+    """
+    cache = getattr(app.state, "openapi_cache", None)
+    if cache is None or cache[0] is not schema:
+        cache = (schema, {"": orjson.dumps(schema)})
+        app.state.openapi_cache = cache
+    encoded = cache[1]
+    content = encoded.get(root_path)
+    if content is None:
+        servers = schema.get("servers", [])
+        if root_path in {server.get("url") for server in servers}:
+            content = encoded[""]
+        else:
+            content = orjson.dumps(
+                {**schema, "servers": [{"url": root_path}] + servers}
+            )
+        encoded[root_path] = content
+    return content
+
+
+async def openapi_json(request: Request) -> Response:
+    root_path = request.scope.get("root_path", "").rstrip("/")
+    if not app.root_path_in_servers:
+        root_path = ""
+    return Response(
+        openapi_bytes(app.openapi(), root_path), media_type="application/json"
+    )
+
+
 app.openapi = custom_openapi
+if app.openapi_url:
+    app.router.routes.insert(
+        0, Route(app.openapi_url, endpoint=openapi_json, include_in_schema=False)
+    )
@@ -1,7 +1,6 @@
 """Script to export the ReDoc documentation page into a standalone HTML file."""
-import json
 import pathlib
-from api import app
+from api import app, openapi_bytes
 
 
 HTML_TEMPLATE = """<!DOCTYPE html>
@@ -34,4 +33,6 @@ HTML_TEMPLATE = """<!DOCTYPE html>
 if __name__ == "__main__":
     path = pathlib.Path("docs")
     path.mkdir(parents=True, exist_ok=True)
-    (path / "index.html").write_text(HTML_TEMPLATE % json.dumps(app.openapi()))
+    (path / "index.html").write_text(
+        HTML_TEMPLATE % openapi_bytes(app.openapi()).decode()
+    )